@@ -1,6 +1,61 @@
 # src/backtest.py
 import numpy as np
 import pandas as pd
+from numba import njit, prange
+
+@njit(cache=True, parallel=True)
+def _cap_holding_period(pos: np.ndarray, max_holding_bars: int) -> np.ndarray:
+    """
+    Force exit after max_holding_bars consecutive bars in the same position.
+    pos is (bars x pairs); each column is an independent pair.
+    """
+    n, k = pos.shape
+    capped = np.zeros_like(pos)
+
+    for j in prange(k):
+        hold = 0
+        prev = 0
+        for i in range(n):
+            v = pos[i, j]
+            if v != 0:
+                if prev == v:
+                    hold += 1
+                else:
+                    hold = 1
+                if hold > max_holding_bars:
+                    hold = 0
+                else:
+                    capped[i, j] = v
+            else:
+                hold = 0
+            prev = capped[i, j]
+
+    return capped
+
+def _lag(a: np.ndarray) -> np.ndarray:
+    """Shift an array forward one bar along axis 0 (NaN-filled), like Series.shift(1)."""
+    lagged = np.empty_like(a, dtype=np.float64)
+    lagged[:1] = np.nan
+    lagged[1:] = a[:-1]
+    return lagged
+
+def _align(a: np.ndarray, src_index: pd.Index, index: pd.Index) -> np.ndarray:
+    """Values of a (indexed by src_index) on index; a no-op when the indexes already match."""
+    if src_index is index or src_index.equals(index):
+        return a
+    return pd.Series(a, index=src_index).reindex(index).to_numpy()
+
+def _ffill_zero(a: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs, then fill leading NaNs with 0 (like .ffill().fillna(0.0))."""
+    mask = np.isnan(a)
+    if not mask.any():
+        return a
+    # index of the last valid bar at or before each bar
+    idx = np.where(mask, 0, np.arange(len(a)))
+    np.maximum.accumulate(idx, out=idx)
+    filled = a[idx]
+    filled[np.isnan(filled)] = 0.0
+    return filled
 
 def backtest_pairs(
     df: pd.DataFrame,
@@ -12,6 +67,7 @@ def backtest_pairs(
     fee_bps: float,
     slippage_bps: float,
     max_holding_bars: int,
+    cost_per_turn: float | None = None,
 ) -> pd.DataFrame:
 
     """
@@ -21,65 +77,124 @@ def backtest_pairs(
 
     PnL approximation using log returns and beta hedge ratio.
     Costs applied on position changes (turnover), proportional to gross exposure.
+    cost_per_turn (e.g. Config.cost_per_turn), when given, overrides (fee_bps + slippage_bps) / 1e4.
     """
 
-    out = df.copy()
+    # extract every input column once; all arithmetic below runs on these arrays
+    y = df["y"].to_numpy(copy=False)
+    x = df["x"].to_numpy(copy=False)
 
     # log returns
-    out["ry"] = np.log(out["y"]).diff()
-    out["rx"] = np.log(out["x"]).diff()
+    ry = np.diff(np.log(y), prepend=np.nan)
+    rx = np.diff(np.log(x), prepend=np.nan)
+
+    # inputs aligned to the price index
+    pos_arr = _align(pos_spread.to_numpy(dtype=np.float64, copy=False), pos_spread.index, df.index)
+    beta_arr = _align(_ffill_zero(beta.to_numpy(dtype=np.float64, copy=False)), beta.index, df.index)
+    vol_arr = _ffill_zero(_align(vol_scale.to_numpy(dtype=np.float64, copy=False), vol_scale.index, df.index))
 
-    out["pos"] = pos_spread.fillna(0.0)
-    out["beta"] = beta.ffill().fillna(0.0)
-    out["vol_scale"] = vol_scale.reindex(out.index).ffill().fillna(0.0)
+    # single pair = one column of the batch backtest
+    res = backtest_pairs_batch(
+        ry[:, None],
+        rx[:, None],
+        pos_arr[:, None],
+        beta_arr[:, None],
+        vol_arr[:, None],
+        gross_leverage=gross_leverage,
+        max_gross_leverage=max_gross_leverage,
+        fee_bps=fee_bps,
+        slippage_bps=slippage_bps,
+        max_holding_bars=max_holding_bars,
+        cost_per_turn=cost_per_turn,
+    )
 
+    # build the result frame once
+    cols = {c: df[c] for c in df.columns}
+    cols.update(
+        ry=ry,
+        rx=rx,
+        pos=res["pos"][:, 0],
+        beta=beta_arr,
+        vol_scale=vol_arr,
+        w_y=res["w_y"][:, 0],
+        w_x=res["w_x"][:, 0],
+        ret_gross=res["ret_gross"][:, 0],
+        cost=res["cost"][:, 0],
+        ret_net=res["ret_net"][:, 0],
+        equity=res["equity"][:, 0],
+    )
+    return pd.DataFrame(cols, index=df.index, copy=False)
+
+def backtest_pairs_batch(
+    ry: np.ndarray,
+    rx: np.ndarray,
+    pos_spread: np.ndarray,
+    beta: np.ndarray,
+    vol_scale: np.ndarray,
+    gross_leverage: float,
+    max_gross_leverage: float,
+    fee_bps: float,
+    slippage_bps: float,
+    max_holding_bars: int,
+    cost_per_turn: float | None = None,
+) -> dict:
+    """
+    Vectorized backtest of K pairs at once. Every input is a (bars x pairs) array
+    (ry / rx may also be (bars x 1) when pairs share a leg): log returns of each leg,
+    spread positions (NaN => flat), and beta / vol_scale already forward-filled.
+
+    Same model as backtest_pairs; returns a dict of (bars x pairs) arrays:
+    pos, w_y, w_x, ret_gross, cost, ret_net, equity.
+    """
+    # positions are in {-1, 0, 1}: keep them as int8
+    pos = np.where(np.isnan(pos_spread), 0, pos_spread).astype(np.int8)
 
     # holding-period cap
     # if position held too long, force exit
-    hold = 0
-    pos_capped = []
-    prev = 0.0
-    for v in out["pos"].values:
-        if v == 0.0:
-            hold = 0
-            pos_capped.append(0.0)
-        else:
-            if prev == v:
-                hold += 1
-            else:
-                hold = 1
-            if hold > max_holding_bars:
-                pos_capped.append(0.0)
-                hold = 0
-            else:
-                pos_capped.append(v)
-        prev = pos_capped[-1]
-    out["pos"] = pos_capped
+    pos = _cap_holding_period(pos, max_holding_bars)
 
     # translate spread position into leg weights (grossed to gross_leverage)
     # we target |w_y| + |w_x| = gross_leverage
     # w_y = pos * a ; w_x = -pos * a * beta
     # choose a so that abs(wy)+abs(wx)=gross
     # Effective gross exposure scales with spread volatility, capped
-    eff_gross = gross_leverage * out["vol_scale"]
-    eff_gross = eff_gross.clip(lower=0.0, upper=max_gross_leverage)
+    eff_gross = np.clip(gross_leverage * vol_scale, 0.0, max_gross_leverage)
 
-    denom = (1.0 + out["beta"].abs()).replace(0.0, np.nan)
+    denom = 1.0 + np.abs(beta)
+    denom[denom == 0.0] = np.nan
     a = eff_gross / denom
 
-    out["w_y"] = out["pos"] * a
-    out["w_x"] = -out["pos"] * a * out["beta"]
+    w_y = pos * a
+    w_x = -pos * a * beta
 
     # portfolio return per bar (log-return approx)
-    out["ret_gross"] = out["w_y"].shift(1) * out["ry"] + out["w_x"].shift(1) * out["rx"]
-    out["ret_gross"] = out["ret_gross"].fillna(0.0)
+    ret_gross = _lag(w_y) * ry + _lag(w_x) * rx
+    ret_gross[np.isnan(ret_gross)] = 0.0
 
     # costs on turnover
-    cost_per_turn = (fee_bps + slippage_bps) / 1e4  # bps -> fraction
-    turnover = (out["w_y"].diff().abs() + out["w_x"].diff().abs()).fillna(0.0)
-    out["cost"] = cost_per_turn * turnover
+    if cost_per_turn is None:
+        cost_per_turn = (fee_bps + slippage_bps) / 1e4  # bps -> fraction
+    # |dw_y| + |dw_x| written into one buffer (single temporary for dw_x)
+    turnover = np.empty_like(w_y)
+    turnover[:1] = 0.0
+    dw_x = np.subtract(w_x[1:], w_x[:-1])
+    np.subtract(w_y[1:], w_y[:-1], out=turnover[1:])
+    np.abs(turnover[1:], out=turnover[1:])
+    np.abs(dw_x, out=dw_x)
+    np.add(turnover[1:], dw_x, out=turnover[1:])
+    turnover[np.isnan(turnover)] = 0.0
+    cost = cost_per_turn * turnover
 
-    out["ret_net"] = out["ret_gross"] - out["cost"]
-    out["equity"] = (1.0 + out["ret_net"]).cumprod()
+    ret_net = ret_gross - cost
+    # ret_net is a log-return approximation, so compound by summing in log space
+    equity = np.exp(np.cumsum(ret_net, axis=0))
 
-    return out
+    return {
+        "pos": pos,
+        "w_y": w_y,
+        "w_x": w_x,
+        "ret_gross": ret_gross,
+        "cost": cost,
+        "ret_net": ret_net,
+        "equity": equity,
+    }
@@ -1,5 +1,5 @@
 # src/config.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass(frozen=True)
 class Config:
@@ -34,3 +34,8 @@ class Config:
     min_scale: float = 0.0  # allow 0
     max_scale: float = 3.0  # cap scaling multiplier
 
+    # Derived constants (set once in __post_init__)
+    cost_per_turn: float = field(init=False)  # (fee + slippage) per unit turnover, bps -> fraction
+
+    def __post_init__(self):
+        object.__setattr__(self, "cost_per_turn", (self.fee_bps + self.slippage_bps) / 1e4)
@@ -1,20 +1,96 @@
 # src/data_loader.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
 import ccxt
+import numpy as np
 import pandas as pd
 
+# on-disk OHLCV cache (parquet), one file per exchange / symbol / timeframe / limit
+CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "cache"
+
+@lru_cache(maxsize=None)
+def _get_exchange(exchange_id: str):
+    exchange_class = getattr(ccxt, exchange_id)
+    return exchange_class({"enableRateLimit": True})
+
 def _fetch_ohlcv_df(exchange, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
     ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-    df = pd.DataFrame(ohlcv, columns=["ts", "open", "high", "low", "close", "volume"])
-    df["ts"] = pd.to_datetime(df["ts"], unit="ms", utc=True)
-    df = df.set_index("ts").sort_index()
+    arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+
+    # ccxt returns millisecond timestamps: view them as datetime64[ms] directly, no parsing
+    ts = pd.DatetimeIndex(arr[:, 0].astype(np.int64).view("datetime64[ms]"), name="ts").tz_localize("UTC")
+    df = pd.DataFrame(arr[:, 1:], index=ts, columns=["open", "high", "low", "close", "volume"], copy=False)
+
+    # candles come back in ascending order; only sort if the exchange breaks that
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
     return df
 
-def load_pair_close(exchange_id: str, symbol_y: str, symbol_x: str, timeframe: str, limit: int) -> pd.DataFrame:
-    exchange_class = getattr(ccxt, exchange_id)
-    exchange = exchange_class({"enableRateLimit": True})
+def _cache_path(cache_dir: Path, exchange_id: str, symbol: str, timeframe: str, limit: int) -> Path:
+    return cache_dir / f"{exchange_id}_{symbol.replace('/', '_')}_{timeframe}_{limit}.parquet"
+
+def _read_cache(path: Path, timeframe: str) -> pd.DataFrame | None:
+    """
+    Cached OHLCV if the file is younger than one bar, else None.
+    """
+    max_age = ccxt.Exchange.parse_timeframe(timeframe)  # seconds per bar
+    if path.exists() and time.time() - path.stat().st_mtime < max_age:
+        return pd.read_parquet(path)
+    return None
+
+def _write_cache(path: Path, df: pd.DataFrame) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, compression="zstd")
+    tmp.replace(path)
+
+def load_pair_close(exchange_id: str, symbol_y: str, symbol_x: str, timeframe: str, limit: int,
+                    cache_dir: Path | None = CACHE_DIR) -> pd.DataFrame:
+    symbols = (symbol_y, symbol_x)
+    paths = {}
+    legs = {}
+
+    # serve what we can from the parquet cache (main thread only)
+    if cache_dir is not None:
+        for symbol in symbols:
+            paths[symbol] = _cache_path(cache_dir, exchange_id, symbol, timeframe, limit)
+            cached = _read_cache(paths[symbol], timeframe)
+            if cached is not None:
+                legs[symbol] = cached
+
+    missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in legs]
+    if missing:
+        exchange = _get_exchange(exchange_id)
+        # load the shared market state once, before any worker touches the exchange
+        exchange.load_markets()
+        if len(missing) == 1:
+            fetched = [_fetch_ohlcv_df(exchange, missing[0], timeframe, limit)]
+        else:
+            # OHLCV requests are network bound: fetch the missing legs concurrently
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                futures = [pool.submit(_fetch_ohlcv_df, exchange, symbol, timeframe, limit) for symbol in missing]
+                fetched = [fut.result() for fut in futures]
+        for symbol, df in zip(missing, fetched):
+            legs[symbol] = df
+            if cache_dir is not None:
+                _write_cache(paths[symbol], df)
+
+    y = legs[symbol_y]
+    x = legs[symbol_x]
+
+    # inner join on the (sorted, unique) candle timestamps without building a hash index
+    ty = y.index.asi8
+    tx = x.index.asi8
+    common = np.intersect1d(ty, tx, assume_unique=True)
+    iy = np.searchsorted(ty, common)
+    ix = np.searchsorted(tx, common)
 
-    y = _fetch_ohlcv_df(exchange, symbol_y, timeframe, limit)[["close"]].rename(columns={"close": "y"})
-    x = _fetch_ohlcv_df(exchange, symbol_x, timeframe, limit)[["close"]].rename(columns={"close": "x"})
+    y_close = y["close"].to_numpy(copy=False)[iy]
+    x_close = x["close"].to_numpy(copy=False)[ix]
+    keep = ~(np.isnan(y_close) | np.isnan(x_close))
 
-    df = y.join(x, how="inner").dropna()
+    df = pd.DataFrame({"y": y_close[keep], "x": x_close[keep]}, index=y.index[iy[keep]], copy=False)
     return df
@@ -2,23 +2,43 @@
 import numpy as np
 import pandas as pd
 
-def sharpe(returns: pd.Series, periods_per_year: int) -> float:
-    r = returns.dropna()
-    if r.std(ddof=0) == 0:
+def _finite(s: pd.Series) -> np.ndarray:
+    a = s.to_numpy(dtype=np.float64, copy=False)
+    return a[~np.isnan(a)]
+
+def _return_stats(r: np.ndarray) -> tuple:
+    """
+    mean, std (ddof=0) and hit rate of NaN-free returns from one set of reductions.
+    """
+    n = len(r)
+    if n == 0:
+        return np.nan, np.nan, 0.0
+    mean = r.sum() / n
+    var = max(np.dot(r, r) / n - mean * mean, 0.0)
+    hits = np.count_nonzero(r > 0) / n
+    return mean, np.sqrt(var), hits
+
+def _sharpe(mean: float, std: float, periods_per_year: int) -> float:
+    if std == 0:
         return 0.0
-    return (r.mean() / r.std(ddof=0)) * np.sqrt(periods_per_year)
+    return (mean / std) * np.sqrt(periods_per_year)
+
+def _max_drawdown(eq: np.ndarray) -> float:
+    if len(eq) == 0:
+        return np.nan
+    peak = np.maximum.accumulate(eq)
+    return ((eq / peak) - 1.0).min()
+
+def sharpe(returns: pd.Series, periods_per_year: int) -> float:
+    mean, std, _ = _return_stats(_finite(returns))
+    return _sharpe(mean, std, periods_per_year)
 
 def max_drawdown(equity: pd.Series) -> float:
-    eq = equity.dropna()
-    peak = eq.cummax()
-    dd = (eq / peak) - 1.0
-    return dd.min()
+    return _max_drawdown(_finite(equity))
 
 def hit_rate(returns: pd.Series) -> float:
-    r = returns.dropna()
-    if len(r) == 0:
-        return 0.0
-    return (r > 0).mean()
+    _, _, hits = _return_stats(_finite(returns))
+    return hits
 
 def summarize(out_df: pd.DataFrame, timeframe: str) -> dict:
     # crude mapping; adjust if you change timeframe
@@ -28,10 +48,13 @@ def summarize(out_df: pd.DataFrame, timeframe: str) -> dict:
     ret = out_df["ret_net"]
     eq = out_df["equity"]
 
+    # one pass over returns (sum, sum of squares, hits) and one over equity
+    mean, std, hits = _return_stats(_finite(ret))
+
     return {
-        "Sharpe": float(sharpe(ret, ppy)),
-        "MaxDrawdown": float(max_drawdown(eq)),
-        "HitRate": float(hit_rate(ret)),
+        "Sharpe": float(_sharpe(mean, std, ppy)),
+        "MaxDrawdown": float(_max_drawdown(_finite(eq))),
+        "HitRate": float(hits),
         "TotalReturn": float(eq.iloc[-1] - 1.0),
         "Bars": int(len(out_df)),
     }
@@ -1,6 +1,8 @@
 # src/run_backtest.py
 import os
 import json
+import matplotlib
+matplotlib.use("Agg")  # batch script: render straight to files, no GUI backend
 import matplotlib.pyplot as plt
 
 from config import Config
@@ -41,6 +43,7 @@ def main():
         fee_bps=cfg.fee_bps,
         slippage_bps=cfg.slippage_bps,
         max_holding_bars=cfg.max_holding_bars,
+        cost_per_turn=cfg.cost_per_turn,
     )
 
     stats = summarize(out, cfg.timeframe)
@@ -56,64 +59,62 @@ def main():
     equity_path = RESULTS_DIR / "equity_curve.png"
     zscore_path = RESULTS_DIR / "zscore.png"
 
+    # one figure reused for every plot
+    fig, ax = plt.subplots(figsize=(10, 5))
+
     # --- Equity Curve ---
-    plt.figure(figsize=(10, 5))
-    out["equity"].plot()
-    plt.title(f"Equity Curve: {cfg.symbol_y} vs {cfg.symbol_x} ({cfg.timeframe})")
-    plt.xlabel("Time (UTC)")
-    plt.ylabel("Equity")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(equity_path, dpi=150)
-    plt.close()
+    out["equity"].plot(ax=ax)
+    ax.set_title(f"Equity Curve: {cfg.symbol_y} vs {cfg.symbol_x} ({cfg.timeframe})")
+    ax.set_xlabel("Time (UTC)")
+    ax.set_ylabel("Equity")
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(equity_path, dpi=150)
+    ax.clear()
 
     # --- Z-Score Plot ---
-    plt.figure(figsize=(10, 5))
-    feat["z"].plot()
-    plt.axhline(cfg.entry_z, linestyle="--", color="red", label="Entry")
-    plt.axhline(-cfg.entry_z, linestyle="--", color="red")
-    plt.axhline(cfg.exit_z, linestyle="--", color="green", label="Exit")
-    plt.axhline(-cfg.exit_z, linestyle="--", color="green")
-    plt.title("Spread Z-Score")
-    plt.xlabel("Time (UTC)")
-    plt.ylabel("Z-Score")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(zscore_path, dpi=150)
-    plt.close()
+    feat["z"].plot(ax=ax)
+    ax.axhline(cfg.entry_z, linestyle="--", color="red", label="Entry")
+    ax.axhline(-cfg.entry_z, linestyle="--", color="red")
+    ax.axhline(cfg.exit_z, linestyle="--", color="green", label="Exit")
+    ax.axhline(-cfg.exit_z, linestyle="--", color="green")
+    ax.set_title("Spread Z-Score")
+    ax.set_xlabel("Time (UTC)")
+    ax.set_ylabel("Z-Score")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(zscore_path, dpi=150)
+    ax.clear()
 
     print(f"Saved equity curve to: {equity_path}")
     print(f"Saved z-score plot to: {zscore_path}")
 
     # --- Cointegration p-value plot ---
     coint_path = RESULTS_DIR / "coint_pvalue.png"
-    plt.figure(figsize=(10, 5))
-    feat["coint_p"].plot()
-    plt.axhline(cfg.coint_p_threshold, linestyle="--", label="p-threshold")
-    plt.title("Rolling Engle–Granger Cointegration p-value")
-    plt.xlabel("Time (UTC)")
-    plt.ylabel("p-value")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(coint_path, dpi=150)
-    plt.close()
+    feat["coint_p"].plot(ax=ax)
+    ax.axhline(cfg.coint_p_threshold, linestyle="--", label="p-threshold")
+    ax.set_title("Rolling Engle–Granger Cointegration p-value")
+    ax.set_xlabel("Time (UTC)")
+    ax.set_ylabel("p-value")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(coint_path, dpi=150)
+    ax.clear()
     print(f"Saved cointegration p-value plot to: {coint_path}")
 
     # --- Volatility Scaling plot ---
     scale_path = RESULTS_DIR / "vol_scale.png"
-    plt.figure(figsize=(10, 5))
-    feat["vol_scale"].plot()
-    plt.title("Volatility Scaling Multiplier (spread risk targeting)")
-    plt.xlabel("Time (UTC)")
-    plt.ylabel("Scale")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(scale_path, dpi=150)
-    plt.close()
+    feat["vol_scale"].plot(ax=ax)
+    ax.set_title("Volatility Scaling Multiplier (spread risk targeting)")
+    ax.set_xlabel("Time (UTC)")
+    ax.set_ylabel("Scale")
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(scale_path, dpi=150)
+    plt.close(fig)
     print(f"Saved vol scale plot to: {scale_path}")
 
-
 if __name__ == "__main__":
     main()
@@ -1,38 +1,143 @@
 # src/signals.py
+import math
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.stattools import coint
+from numba import njit, prange
+from statsmodels.tsa.adfvalues import tau_c_largep, tau_c_smallp, tau_max_c, tau_min_c, tau_star_c
+
+# MacKinnon (1994) response-surface coefficients for the Engle-Granger test
+# with a constant and N = 2 series, read from statsmodels once at import.
+# numba freezes these globals into the compiled kernels, so no statsmodels
+# lookups happen per window; the arrays are made read-only to keep the
+# Python-side tables identical to the compiled constants.
+_EG_N = 2
+_TAU_MAX = float(tau_max_c[_EG_N - 1])
+_TAU_MIN = float(tau_min_c[_EG_N - 1])
+_TAU_STAR = float(tau_star_c[_EG_N - 1])
+_TAU_SMALLP = np.ascontiguousarray(tau_c_smallp[_EG_N - 1], dtype=np.float64)
+_TAU_LARGEP = np.ascontiguousarray(tau_c_largep[_EG_N - 1], dtype=np.float64)
+_TAU_SMALLP.setflags(write=False)
+_TAU_LARGEP.setflags(write=False)
+_SQRT_EPS = np.sqrt(np.finfo(np.float64).eps)
+
+@njit(cache=True)
+def _mackinnonp(teststat: float) -> float:
+    """Approximate asymptotic p-value of an Engle-Granger t-stat (same as statsmodels' mackinnonp)."""
+    if teststat > _TAU_MAX:
+        return 1.0
+    if teststat < _TAU_MIN:
+        return 0.0
+    coef = _TAU_SMALLP if teststat <= _TAU_STAR else _TAU_LARGEP
+    # polynomial in teststat, coefficients in ascending order
+    val = 0.0
+    for k in range(len(coef) - 1, -1, -1):
+        val = val * teststat + coef[k]
+    return 0.5 * math.erfc(-val / math.sqrt(2.0))
+
+@njit(cache=True, parallel=True, nogil=True)
+def _rolling_coint_pvalue_kernel(ly: np.ndarray, lx: np.ndarray, window: int) -> np.ndarray:
+    n = len(ly)
+    pvals = np.full(n, np.nan)
+    if n < window or window < 5:
+        return pvals
+
+    # every window is independent: each iteration reads its own slice and writes one p-value
+    for i in prange(window - 1, n):
+        start = i - window + 1
+
+        # window means (skip windows containing NaN)
+        sx = 0.0
+        sy = 0.0
+        for j in range(start, i + 1):
+            sx += lx[j]
+            sy += ly[j]
+        if sx != sx or sy != sy:
+            continue
+        mx = sx / window
+        my = sy / window
+
+        # cointegrating regression y = alpha + beta * x on centred data
+        sxx = 0.0
+        syy = 0.0
+        sxy = 0.0
+        for j in range(start, i + 1):
+            dx = lx[j] - mx
+            dy = ly[j] - my
+            sxx += dx * dx
+            syy += dy * dy
+            sxy += dx * dy
+        if sxx <= 0.0 or syy <= 0.0:
+            continue
+        beta = sxy / sxx
+
+        # (almost) perfectly collinear legs: statsmodels reports t = -inf
+        r2 = sxy * sxy / (sxx * syy)
+        if r2 >= 1.0 - 100.0 * _SQRT_EPS:
+            pvals[i] = 0.0
+            continue
+
+        # augmented Dickey-Fuller regression with one fixed lag, no constant:
+        #   d(e_t) = rho * e_{t-1} + gamma * d(e_{t-1})
+        # closed-form 2x2 OLS, t-stat on rho
+        s_ll = 0.0
+        s_lq = 0.0
+        s_qq = 0.0
+        s_ld = 0.0
+        s_qd = 0.0
+        s_dd = 0.0
+        e_prev = (ly[start] - my) - beta * (lx[start] - mx)
+        e_cur = (ly[start + 1] - my) - beta * (lx[start + 1] - mx)
+        q = e_cur - e_prev
+        lag = e_cur
+        for j in range(start + 2, i + 1):
+            e = (ly[j] - my) - beta * (lx[j] - mx)
+            d = e - lag
+            s_ll += lag * lag
+            s_lq += lag * q
+            s_qq += q * q
+            s_ld += lag * d
+            s_qd += q * d
+            s_dd += d * d
+            q = d
+            lag = e
+        det = s_ll * s_qq - s_lq * s_lq
+        if det <= 0.0:
+            continue
+        rho = (s_qq * s_ld - s_lq * s_qd) / det
+        gamma = (s_ll * s_qd - s_lq * s_ld) / det
+        ssr = s_dd - rho * s_ld - gamma * s_qd
+        dof = window - 4  # (window - 2) usable differences, two regressors
+        if ssr <= 0.0:
+            continue
+        tstat = rho / math.sqrt(ssr / dof * s_qq / det)
+        pvals[i] = _mackinnonp(tstat)
+
+    return pvals
 
 def rolling_coint_pvalue(log_y: pd.Series, log_x: pd.Series, window: int) -> pd.Series:
     """
     Rolling Engle–Granger cointegration test p-values.
     H0: no cointegration. Lower p-value => more evidence of cointegration.
-    """
-    pvals = pd.Series(index=log_y.index, dtype=float)
-
-    ly = log_y.values
-    lx = log_x.values
-    idx = log_y.index
-
-    for i in range(window - 1, len(idx)):
-        y_win = ly[i - window + 1 : i + 1]
-        x_win = lx[i - window + 1 : i + 1]
-        # coint returns (t_stat, p_value, crit_values)
-        try:
-            _, pval, _ = coint(y_win, x_win)
-        except Exception:
-            pval = np.nan
-        pvals.iloc[i] = pval
 
-    return pvals
+    Equivalent to statsmodels' coint(y, x, maxlag=1, autolag=None) on every window:
+    a fixed one-lag ADF test replaces the per-window lag search. The hedge regression
+    and the ADF regression on its residuals are solved in closed form; windows are
+    evaluated in parallel across cores.
+    """
+    # float32 or float64 inputs; the kernel accumulates in float64
+    ly = log_y.to_numpy(copy=False)
+    lx = log_x.to_numpy(copy=False)
+    pvals = _rolling_coint_pvalue_kernel(ly, lx, window)
+    return pd.Series(pvals, index=log_y.index)
 
 def apply_coint_regime_filter(pos: pd.Series, pvals: pd.Series, p_threshold: float) -> pd.Series:
     """
     Force flat (0 position) when p-value indicates no cointegration.
     """
-    tradable = (pvals < p_threshold)
-    filtered = pos.where(tradable, 0.0)
-    return filtered
+    # NaN p-values compare False => flat, same as before
+    p_arr = pvals.reindex(pos.index).to_numpy(copy=False)
+    filtered = np.where(p_arr < p_threshold, pos.to_numpy(copy=False), 0.0)
+    return pd.Series(filtered, index=pos.index, copy=False)
 
 
 def rolling_ols_beta(y: pd.Series, x: pd.Series, window: int) -> pd.Series:
@@ -47,6 +152,126 @@ def rolling_ols_beta(y: pd.Series, x: pd.Series, window: int) -> pd.Series:
     beta = cov / var
     return beta
 
+@njit(cache=True, error_model="numpy")
+def _rolling_spread_stats_kernel(ly: np.ndarray, lx: np.ndarray, w_beta: int, w_z: int, w_vol: int):
+    """
+    Single pass over the log prices producing rolling beta, spread, z-score and
+    the volatility of spread changes. Same definitions as rolling_ols_beta, the
+    rolling mean / std(ddof=0) of the spread and rolling std(ddof=0) of diff(spread);
+    a window containing NaN yields NaN, like pandas' min_periods=window.
+    """
+    n = len(ly)
+    beta = np.full(n, np.nan)
+    spread = np.full(n, np.nan)
+    z = np.full(n, np.nan)
+    vol = np.full(n, np.nan)
+
+    # beta is shift invariant, so centre the running sums on the first bar
+    y0 = ly[0] if n > 0 and ly[0] == ly[0] else 0.0
+    x0 = lx[0] if n > 0 and lx[0] == lx[0] else 0.0
+    sum_x = 0.0
+    sum_y = 0.0
+    sum_xx = 0.0
+    sum_xy = 0.0
+    bad_b = 0
+
+    # z-score accumulators, centred on the first finite spread
+    s0 = np.nan
+    sum_s = 0.0
+    sum_ss = 0.0
+    bad_z = 0
+
+    # spread-change accumulators (changes are ~zero mean, no centring needed)
+    sum_d = 0.0
+    sum_dd = 0.0
+    bad_d = 0
+
+    for i in range(n):
+        # --- beta window: add new, drop old ---
+        xv = lx[i] - x0
+        yv = ly[i] - y0
+        if xv == xv and yv == yv:
+            sum_x += xv
+            sum_y += yv
+            sum_xx += xv * xv
+            sum_xy += xv * yv
+        else:
+            bad_b += 1
+        if i >= w_beta:
+            xo = lx[i - w_beta] - x0
+            yo = ly[i - w_beta] - y0
+            if xo == xo and yo == yo:
+                sum_x -= xo
+                sum_y -= yo
+                sum_xx -= xo * xo
+                sum_xy -= xo * yo
+            else:
+                bad_b -= 1
+
+        if i >= w_beta - 1 and bad_b == 0:
+            # cov / var; the ddof normalisation cancels
+            b = (w_beta * sum_xy - sum_x * sum_y) / (w_beta * sum_xx - sum_x * sum_x)
+            beta[i] = b
+            spread[i] = ly[i] - b * lx[i]
+
+        # --- z window over the spread just emitted ---
+        sv = spread[i]
+        if sv == sv and s0 != s0:
+            s0 = sv
+        sv -= s0
+        if sv == sv:
+            sum_s += sv
+            sum_ss += sv * sv
+        else:
+            bad_z += 1
+        if i >= w_z:
+            so = spread[i - w_z] - s0
+            if so == so:
+                sum_s -= so
+                sum_ss -= so * so
+            else:
+                bad_z -= 1
+
+        if i >= w_z - 1 and bad_z == 0:
+            m = sum_s / w_z
+            var = sum_ss / w_z - m * m
+            if var < 0.0:
+                var = 0.0
+            z[i] = (sv - m) / math.sqrt(var)
+
+        # --- vol window over diff(spread) ---
+        dv = spread[i] - spread[i - 1] if i > 0 else np.nan
+        if dv == dv:
+            sum_d += dv
+            sum_dd += dv * dv
+        else:
+            bad_d += 1
+        if i >= w_vol:
+            k = i - w_vol
+            do = spread[k] - spread[k - 1] if k > 0 else np.nan
+            if do == do:
+                sum_d -= do
+                sum_dd -= do * do
+            else:
+                bad_d -= 1
+
+        if i >= w_vol - 1 and bad_d == 0:
+            md = sum_d / w_vol
+            var_d = sum_dd / w_vol - md * md
+            if var_d < 0.0:
+                var_d = 0.0
+            vol[i] = math.sqrt(var_d)
+
+    return beta, spread, z, vol
+
+def _vol_to_scale(vol: np.ndarray, target_spread_vol: float,
+                  min_scale: float, max_scale: float) -> np.ndarray:
+    # undefined or zero vol => no exposure
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = target_spread_vol / vol
+    scale[~np.isfinite(scale)] = 0.0
+    return np.clip(scale, min_scale, max_scale)
+
 def compute_vol_scale(spread: pd.Series, window: int, target_spread_vol: float,
                       min_scale: float, max_scale: float) -> pd.Series:
     """
@@ -55,11 +280,8 @@ def compute_vol_scale(spread: pd.Series, window: int, target_spread_vol: float,
     """
     spread_d = spread.diff()
     vol = spread_d.rolling(window).std(ddof=0)
-
-    scale = target_spread_vol / vol
-    scale = scale.replace([np.inf, -np.inf], np.nan).fillna(0.0)
-    scale = scale.clip(lower=min_scale, upper=max_scale)
-    return scale
+    scale = _vol_to_scale(vol.to_numpy(copy=False), target_spread_vol, min_scale, max_scale)
+    return pd.Series(scale, index=spread.index)
 
 def compute_spread_and_z(
     df: pd.DataFrame,
@@ -72,62 +294,75 @@ def compute_spread_and_z(
     min_scale: float,
     max_scale: float,
 ) -> pd.DataFrame:
-    out = df.copy()
+    y = df["y"].to_numpy(copy=False)
+    x = df["x"].to_numpy(copy=False)
 
-    # log prices
-    out["ly"] = np.log(out["y"])
-    out["lx"] = np.log(out["x"])
+    # log prices, stored as float32 working buffers to halve memory traffic
+    # (prices carry < 8 significant digits; all rolling sums accumulate in float64)
+    ly = np.log(y, out=np.empty(len(y), dtype=np.float32))
+    lx = np.log(x, out=np.empty(len(x), dtype=np.float32))
 
-    # rolling hedge ratio beta
-    out["beta"] = rolling_ols_beta(out["ly"], out["lx"], lookback_beta)
-
-    # spread
-    out["spread"] = out["ly"] - out["beta"] * out["lx"]
-
-    # z-score
-    m = out["spread"].rolling(lookback_z).mean()
-    s = out["spread"].rolling(lookback_z).std(ddof=0)
-    out["z"] = (out["spread"] - m) / s
+    # rolling hedge ratio beta, spread, z-score and spread-change vol in one pass
+    beta, spread, z, spread_vol = _rolling_spread_stats_kernel(
+        ly,
+        lx,
+        lookback_beta,
+        lookback_z,
+        lookback_spread_vol,
+    )
 
     # rolling cointegration p-values + regime flag
-    out["coint_p"] = rolling_coint_pvalue(out["ly"], out["lx"], lookback_coint)
-    out["is_coint"] = out["coint_p"] < coint_p_threshold
+    coint_p = _rolling_coint_pvalue_kernel(ly, lx, lookback_coint)
 
     # volatility scaling factor (risk targeting)
-    out["vol_scale"] = compute_vol_scale(
-        out["spread"],
-        window=lookback_spread_vol,
-        target_spread_vol=target_spread_vol,
-        min_scale=min_scale,
-        max_scale=max_scale,
+    vol_scale = _vol_to_scale(spread_vol, target_spread_vol, min_scale, max_scale)
+
+    # build the result frame once
+    cols = {c: df[c] for c in df.columns}
+    cols.update(
+        ly=ly,
+        lx=lx,
+        beta=beta,
+        spread=spread,
+        z=z,
+        coint_p=coint_p,
+        is_coint=coint_p < coint_p_threshold,
+        vol_scale=vol_scale,
     )
+    out = pd.DataFrame(cols, index=df.index, copy=False)
 
     return out
 
 
-def generate_positions(z: pd.Series, entry_z: float, exit_z: float) -> pd.Series:
-    """
-    Position is +1 for long spread (long y, short x) and -1 for short spread.
-    Entry when |z| >= entry_z, exit when |z| <= exit_z.
-    """
-    pos = pd.Series(index=z.index, dtype=float)
-    state = 0.0
+@njit(cache=True)
+def _positions_kernel(z: np.ndarray, entry_z: float, exit_z: float) -> np.ndarray:
+    n = len(z)
+    out = np.zeros(n, dtype=np.int8)
+    state = 0
 
-    for t, val in z.items():
-        if np.isnan(val):
-            pos.loc[t] = 0.0
-            state = 0.0
+    for i in range(n):
+        v = z[i]
+        if v != v:  # NaN
+            state = 0
             continue
 
-        if state == 0.0:
-            if val >= entry_z:
-                state = -1.0  # short spread
-            elif val <= -entry_z:
-                state = +1.0  # long spread
+        if state == 0:
+            if v >= entry_z:
+                state = -1  # short spread
+            elif v <= -entry_z:
+                state = 1  # long spread
         else:
-            if abs(val) <= exit_z:
-                state = 0.0
+            if abs(v) <= exit_z:
+                state = 0
 
-        pos.loc[t] = state
+        out[i] = state
 
-    return pos
\ No newline at end of file
+    return out
+
+def generate_positions(z: pd.Series, entry_z: float, exit_z: float) -> pd.Series:
+    """
+    Position is +1 for long spread (long y, short x) and -1 for short spread.
+    Entry when |z| >= entry_z, exit when |z| <= exit_z.
+    """
+    pos = _positions_kernel(z.to_numpy(dtype=np.float64, copy=False), entry_z, exit_z)
+    return pd.Series(pos.astype(np.float64), index=z.index)